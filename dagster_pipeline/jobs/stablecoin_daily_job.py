@@ -1,16 +1,25 @@
 """
 Dagster job to run daily stablecoin monitoring tasks.
 """
-from dagster import job, schedule, ScheduleEvaluationContext, DefaultScheduleStatus
-from dagster_pipeline.ops.chainlink_price_op import fetch_chainlink_price_op
+from dagster import job, schedule, ScheduleEvaluationContext, DefaultScheduleStatus, multiprocess_executor
+from dagster_pipeline.ops.chainlink_price_op import (
+    TOKEN_SYMBOLS,
+    emit_token_symbols_op,
+    fetch_token_price_op,
+    load_chainlink_prices_op,
+)
 
 
-@job
+@job(executor_def=multiprocess_executor.configured({"max_concurrent": len(TOKEN_SYMBOLS)}))
 def stablecoin_daily_job():
     """
     Daily job to fetch Chainlink prices and load them into Snowflake.
+    
+    Each token is fetched by its own mapped op, running concurrently and
+    retrying independently; the results are written to Snowflake in one load.
     """
-    fetch_chainlink_price_op()
+    price_records = emit_token_symbols_op().map(fetch_token_price_op)
+    load_chainlink_prices_op(price_records.collect())
 
 
 @schedule(
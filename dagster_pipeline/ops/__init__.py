@@ -1,5 +1,8 @@
 # Dagster operations
-from dagster_pipeline.ops.chainlink_price_op import fetch_chainlink_price_op
-
-__all__ = ["fetch_chainlink_price_op"]
+from dagster_pipeline.ops.chainlink_price_op import (
+    emit_token_symbols_op,
+    fetch_token_price_op,
+    load_chainlink_prices_op,
+)
 
+__all__ = ["emit_token_symbols_op", "fetch_token_price_op", "load_chainlink_prices_op"]
@@ -1,12 +1,18 @@
 """
-Dagster op to fetch Chainlink prices and load them into Snowflake.
+Dagster ops to fetch Chainlink prices and load them into Snowflake.
+
+Prices are fetched by one mapped op per token so the fetches run (and retry)
+independently, then collected into a single write to Snowflake.
 """
 import os
 import sys
+import time
 import pandas as pd
+from typing import Optional
 from dotenv import load_dotenv
-from dagster import op, Output, MetadataValue
+from dagster import op, Output, MetadataValue, DynamicOut, DynamicOutput, RetryPolicy, Failure
 from snowflake.connector import connect
+from snowflake.connector.errors import ProgrammingError
 from snowflake.connector.pandas_tools import write_pandas
 
 # Load environment variables
@@ -14,7 +20,8 @@ load_dotenv()
 
 # Add scripts directory to path to import fetch functions
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
-from fetch_chainlink_price import fetch_all_chainlink_prices
+from fetch_chainlink_price import TOKEN_SYMBOLS, build_price_frame, fetch_token_price, get_web3_connection
+from snowflake_ddl import CREATE_CHAINLINK_PRICES_TABLE
 
 
 def get_snowflake_connection():
@@ -36,19 +43,106 @@ def get_snowflake_connection():
     return conn
 
 
+def write_prices_to_snowflake(conn, df: pd.DataFrame, table_name: str):
+    """
+    Append price rows to an existing Snowflake table.
+    
+    Args:
+        conn: Snowflake connection
+        df: DataFrame with columns matching the table
+        table_name: Target table name
+        
+    Returns:
+        write_pandas result tuple (success, nchunks, nrows, output)
+    """
+    # Write data to Snowflake (append mode) as a single snappy Parquet file
+    return write_pandas(
+        conn,
+        df,
+        table_name=table_name,
+        schema=os.getenv("SNOWFLAKE_SCHEMA"),
+        database=os.getenv("SNOWFLAKE_DATABASE"),
+        auto_create_table=False,
+        overwrite=False,
+        quote_identifiers=False,
+        use_logical_type=True,
+        compression="snappy",
+        parallel=4
+    )
+
+
+@op(out=DynamicOut(str))
+def emit_token_symbols_op(context):
+    """
+    Fan out one mapped fetch per configured token.
+    
+    Yields:
+        DynamicOutput per token symbol, keyed by the symbol
+    """
+    for token_symbol in TOKEN_SYMBOLS:
+        yield DynamicOutput(token_symbol, mapping_key=token_symbol)
+
+
+# Retries per token before its fetch is given up on
+FETCH_MAX_RETRIES = 3
+
+
+@op(retry_policy=RetryPolicy(max_retries=FETCH_MAX_RETRIES, delay=10))
+def fetch_token_price_op(context, token_symbol: str) -> Optional[dict]:
+    """
+    Fetch the latest Chainlink price for a single token.
+    
+    Earlier attempts raise Failure so the retry policy kicks in. The final
+    attempt returns None instead, so one broken feed doesn't stop the
+    collected load of the other tokens.
+    
+    Args:
+        token_symbol: Token symbol (USDC or USDT)
+        
+    Returns:
+        Price data dictionary for the token, or None if every attempt failed
+    """
+    context.log.info(f"Fetching {token_symbol} Chainlink price...")
+    
+    price_data = fetch_token_price(get_web3_connection(), token_symbol)
+    
+    if price_data is None:
+        if context.retry_number >= FETCH_MAX_RETRIES:
+            context.log.error(
+                f"Failed to fetch price data for {token_symbol} after {FETCH_MAX_RETRIES} retries, skipping"
+            )
+            return None
+        raise Failure(f"Failed to fetch price data for {token_symbol}")
+    
+    return price_data
+
+
 @op
-def fetch_chainlink_price_op(context):
+def load_chainlink_prices_op(context, price_records: list):
     """
-    Fetch Chainlink price data for all stablecoins and load into Snowflake.
+    Load the collected per-token prices into Snowflake with one write.
     
+    Expects the schema created by setup_snowflake_schema() in
+    scripts/utils/setup_snowflake_tables.py. If CHAINLINK_PRICES is missing
+    (first deploy), the table is created and the write retried once.
+    
+    Args:
+        price_records: Price data dictionaries from fetch_token_price_op;
+            None entries (tokens that failed every retry) are skipped
+        
     Returns:
         Dictionary with summary of loaded data
     """
-    context.log.info("Starting Chainlink price fetch...")
-    
     try:
-        # Fetch price data
-        df = fetch_all_chainlink_prices()
+        # Each token was fetched in its own process; stamp one run timestamp
+        # so all tokens' rows from this run share a TIMESTAMP
+        run_timestamp = int(time.time())
+        price_records = [
+            {**record, "timestamp": run_timestamp}
+            for record in price_records
+            if record is not None
+        ]
+        df = build_price_frame(price_records)
         
         if df.empty:
             context.log.warning("No price data fetched")
@@ -59,59 +153,33 @@ def fetch_chainlink_price_op(context):
         
         context.log.info(f"Fetched price data for {len(df)} tokens")
         
-        # Rename columns to match Snowflake schema
-        # New script uses token_symbol and deviation_from_peg
-        df = df.rename(columns={
-            "token_symbol": "token",
-            "deviation_from_peg": "deviation_from_1"
-        })
-        
-        # Remove datetime column if present (keep only timestamp)
-        if "datetime" in df.columns:
-            df = df.drop(columns=["datetime"])
-        
         # Load to Snowflake
         conn = get_snowflake_connection()
         try:
             table_name = "CHAINLINK_PRICES"
             
-            # Create table if it doesn't exist
-            create_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                TIMESTAMP BIGINT,
-                TOKEN VARCHAR(10),
-                PRICE DOUBLE,
-                DEVIATION_FROM_1 DOUBLE,
-                LOADED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-            )
-            """
-            conn.cursor().execute(create_table_sql)
-            
-            # Write data to Snowflake (append mode)
-            success, nchunks, nrows, _ = write_pandas(
-                conn,
-                df,
-                table_name=table_name,
-                schema=os.getenv("SNOWFLAKE_SCHEMA"),
-                database=os.getenv("SNOWFLAKE_DATABASE"),
-                auto_create_table=False,
-                overwrite=False
-            )
+            try:
+                success, nchunks, nrows, _ = write_prices_to_snowflake(conn, df, table_name)
+            except ProgrammingError as e:
+                if "does not exist" not in str(e):
+                    raise
+                context.log.warning(
+                    f"{table_name} does not exist, creating it. "
+                    "Run scripts/utils/setup_snowflake_tables.py to create the full schema."
+                )
+                conn.cursor().execute(CREATE_CHAINLINK_PRICES_TABLE)
+                success, nchunks, nrows, _ = write_prices_to_snowflake(conn, df, table_name)
             
             if success:
                 context.log.info(f"Successfully loaded {nrows} price records to Snowflake")
                 
-                # Log price summary
-                for _, row in df.iterrows():
-                    context.log.info(
-                        f"{row['token']}: ${row['price']:.6f} "
-                        f"(deviation: {row['deviation_from_1']*100:.4f}%)"
-                    )
+                # Log price summary as one event; per-token values are in the metadata
+                context.log.info("Prices:\n" + df[["TOKEN", "PRICE", "DEVIATION_FROM_1"]].to_string(index=False))
                 
                 metadata = {
                     "rows_loaded": MetadataValue.int(nrows),
                     "chunks": MetadataValue.int(nchunks),
-                    "tokens": MetadataValue.json(df[["token", "price", "deviation_from_1"]].to_dict("records"))
+                    "tokens": MetadataValue.json(df[["TOKEN", "PRICE", "DEVIATION_FROM_1"]].to_dict("records"))
                 }
                 
                 return Output(
@@ -125,6 +193,6 @@ def fetch_chainlink_price_op(context):
             conn.close()
             
     except Exception as e:
-        context.log.error(f"Error fetching Chainlink prices: {str(e)}")
+        context.log.error(f"Error loading Chainlink prices: {str(e)}")
         raise
 
@@ -1,6 +1,8 @@
 {{
     config(
-        materialized='table'
+        materialized='dynamic_table',
+        target_lag='1 minute',
+        snowflake_warehouse=env_var('SNOWFLAKE_WAREHOUSE')
     )
 }}
 
@@ -58,5 +60,4 @@ select
     end as zscore_status
 from rolling_stats
 where observations_24h >= 2  -- Need at least 2 observations for meaningful stats
-order by token, timestamp desc
 
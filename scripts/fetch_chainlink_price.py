@@ -7,12 +7,20 @@ calculates deviation from the $1.00 peg, and saves the results to CSV.
 The script is designed to be reusable for Dagster jobs and dbt pipelines.
 """
 import os
+import time
 import logging
+import functools
+import numpy as np
 import pandas as pd
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from eth_abi import encode, decode
+from eth_abi.exceptions import DecodingError
 from web3 import Web3
 from typing import Optional
-from datetime import datetime, timezone
 # Removed eth_defi dependency - using web3 directly instead
 
 # Configure logging
@@ -31,21 +39,47 @@ CHAINLINK_FEEDS = {
     "USDT": "0x3E7d1eAB13ad0104d2750B8863b489D65364e32D",  # USDT/USD
 }
 
+# Feed addresses checksummed once at import so the fetch path never re-hashes them
+_FEEDS = {token: Web3.to_checksum_address(address) for token, address in CHAINLINK_FEEDS.items()}
+
+# Chainlink feed decimals (immutable per aggregator, checked by verify_chainlink_decimals)
+CHAINLINK_DECIMALS = {
+    "USDC": 8,
+    "USDT": 8,
+}
+
 # Token symbols to fetch
 TOKEN_SYMBOLS = ["USDC", "USDT"]
 
+# Timeout for raw JSON-RPC requests (seconds)
+RPC_TIMEOUT_SECONDS = 10
+
+# Shared HTTP session so RPC calls reuse keep-alive connections instead of
+# paying a TCP+TLS handshake on every fetch. eth_call is read-only, so POSTs
+# are safe to retry.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["POST"])
+    )
+))
+
 
-def get_web3_connection() -> Web3:
+def get_rpc_url() -> str:
     """
-    Initialize Web3 connection using Alchemy RPC URL from environment variables.
+    Resolve the Alchemy RPC URL from environment variables.
     Supports both Streamlit Cloud secrets and local .env files.
     
     Returns:
-        Web3 instance connected to Ethereum mainnet
+        Ethereum mainnet RPC endpoint URL
         
     Raises:
         ValueError: If ALCHEMY_RPC_URL is not set
-        ConnectionError: If connection to RPC endpoint fails
     """
     # Try to get from Streamlit secrets if available (for Streamlit Cloud)
     rpc_url = None
@@ -63,22 +97,50 @@ def get_web3_connection() -> Web3:
     if not rpc_url:
         raise ValueError("ALCHEMY_RPC_URL not set in environment variables or Streamlit secrets")
     
-    try:
-        logger.info(f"Connecting to Alchemy RPC endpoint...")
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
-        
-        if not w3.is_connected():
-            raise ConnectionError("Failed to connect to RPC endpoint")
-        
-        # Verify connection by getting latest block
-        block_number = w3.eth.block_number
-        logger.info(f"Successfully connected to Ethereum mainnet (block: {block_number})")
+    return rpc_url
+
+
+@functools.lru_cache(maxsize=1)
+def _build_web3(rpc_url: str) -> Web3:
+    """
+    Build a Web3 instance on the shared HTTP session.
+    
+    Cached so repeated fetches (e.g. the continuous loop) reuse the same
+    provider and its pooled connections.
+    """
+    logger.info("Connecting to Alchemy RPC endpoint...")
+    return Web3(Web3.HTTPProvider(rpc_url, session=_SESSION))
+
+
+def get_web3_connection(verify_connection: bool = False) -> Web3:
+    """
+    Initialize Web3 connection using Alchemy RPC URL from environment variables.
+    Supports both Streamlit Cloud secrets and local .env files.
+    
+    No RPC calls are made unless verify_connection is set; connection errors
+    otherwise surface from the first real eth_call.
+    
+    Args:
+        verify_connection: Probe the endpoint and log the latest block number
         
-        return w3
+    Returns:
+        Web3 instance for Ethereum mainnet
         
-    except Exception as e:
-        logger.error(f"Error connecting to RPC: {str(e)}")
-        raise ConnectionError(f"Error connecting to RPC: {str(e)}")
+    Raises:
+        ValueError: If ALCHEMY_RPC_URL is not set
+        ConnectionError: If verify_connection is set and the endpoint is unreachable
+    """
+    w3 = _build_web3(get_rpc_url())
+    
+    if verify_connection:
+        try:
+            block_number = w3.eth.block_number
+            logger.info(f"Successfully connected to Ethereum mainnet (block: {block_number})")
+        except Exception as e:
+            logger.error(f"Error connecting to RPC: {str(e)}")
+            raise ConnectionError(f"Error connecting to RPC: {str(e)}")
+    
+    return w3
 
 
 # Chainlink Aggregator ABI (minimal - just the functions we need)
@@ -105,15 +167,120 @@ CHAINLINK_ABI = [
     }
 ]
 
+# Function selector for the raw latestRoundData() calls bundled into the multicall
+LATEST_ROUND_DATA_SELECTOR = "0xfeaf968c"
+
+# Multicall3 is deployed at the same address on every EVM chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# Selector of aggregate3((address,bool,bytes)[])
+AGGREGATE3_SELECTOR = "0x82ad56cb"
 
-def fetch_token_price(w3: Web3, token_symbol: str, feed_address: str) -> Optional[dict]:
+
+def _decode_word(result: str, index: int = 0, signed: bool = False) -> int:
+    """
+    Decode the 32-byte ABI word at the given index of a hex eth_call result.
+    
+    Args:
+        result: Hex-encoded return data (with or without 0x prefix)
+        index: Zero-based index of the 32-byte word to decode
+        signed: Decode as two's complement (int256) instead of unsigned
+        
+    Returns:
+        Decoded integer value
+        
+    Raises:
+        ValueError: If the return data is too short
+    """
+    data = result[2:] if result.startswith("0x") else result
+    word = data[index * 64:(index + 1) * 64]
+    if len(word) != 64:
+        raise ValueError(f"Return data too short to contain word {index}: {result!r}")
+    return int.from_bytes(bytes.fromhex(word), byteorder="big", signed=signed)
+
+
+def _build_price_record(token_symbol: str, answer: int, decimals: int, timestamp: Optional[int] = None) -> Optional[dict]:
+    """
+    Convert a raw Chainlink answer into a price data dictionary.
+    
+    Args:
+        token_symbol: Token symbol (USDC or USDT)
+        answer: Raw latestRoundData answer
+        decimals: Feed decimals
+        timestamp: Unix timestamp (seconds) to record; defaults to now
+        
+    Returns:
+        Dictionary with price data or None if the price is invalid
+    """
+    # Convert to float (adjust for decimals)
+    price_float = float(answer) / (10 ** decimals)
+    
+    if price_float <= 0:
+        logger.warning(f"Received invalid price ({price_float}) for {token_symbol}")
+        return None
+    
+    # Calculate deviation from $1.00 peg
+    deviation_from_peg = price_float - 1.0
+    
+    # Get current Unix timestamp (seconds, UTC) unless the caller stamped one
+    if timestamp is None:
+        timestamp = int(time.time())
+    
+    logger.info(
+        f"  {token_symbol} price: ${price_float:.6f} "
+        f"(deviation: {deviation_from_peg:.6f}, {deviation_from_peg*100:.4f}%)"
+    )
+    
+    return {
+        "timestamp": timestamp,
+        "token_symbol": token_symbol,
+        "price": price_float,
+        "deviation_from_peg": deviation_from_peg
+    }
+
+
+def build_price_frame(records: list) -> pd.DataFrame:
+    """
+    Build a typed DataFrame in the CHAINLINK_PRICES column layout.
+    
+    Columns are filled straight into typed NumPy arrays (sorted by token for
+    consistent output) so callers can hand the frame to write_pandas without
+    any rename/select copies.
+    
+    Args:
+        records: Price data dictionaries as returned by fetch_token_price
+        
+    Returns:
+        DataFrame with columns: TIMESTAMP, TOKEN, PRICE, DEVIATION_FROM_1
+    """
+    records = sorted(records, key=lambda record: record["token_symbol"])
+    n = len(records)
+    
+    timestamps = np.empty(n, dtype=np.int64)
+    tokens = np.empty(n, dtype=object)
+    prices = np.empty(n, dtype=np.float64)
+    deviations = np.empty(n, dtype=np.float64)
+    
+    for i, record in enumerate(records):
+        timestamps[i] = record["timestamp"]
+        tokens[i] = record["token_symbol"]
+        prices[i] = record["price"]
+        deviations[i] = record["deviation_from_peg"]
+    
+    return pd.DataFrame({
+        "TIMESTAMP": timestamps,
+        "TOKEN": tokens,
+        "PRICE": prices,
+        "DEVIATION_FROM_1": deviations
+    })
+
+
+def fetch_token_price(w3: Web3, token_symbol: str) -> Optional[dict]:
     """
     Fetch token price from Chainlink feed using web3 directly.
     
     Args:
         w3: Web3 instance connected to Ethereum
         token_symbol: Token symbol (USDC or USDT)
-        feed_address: Chainlink price feed contract address
         
     Returns:
         Dictionary with price data or None if fetch fails
@@ -122,42 +289,20 @@ def fetch_token_price(w3: Web3, token_symbol: str, feed_address: str) -> Optiona
         RuntimeError: If price fetch fails after retries
     """
     try:
+        feed_address = _FEEDS[token_symbol]
         logger.info(f"Fetching {token_symbol} price from Chainlink feed: {feed_address}")
         
         # Create contract instance
-        contract = w3.eth.contract(address=Web3.to_checksum_address(feed_address), abi=CHAINLINK_ABI)
+        contract = w3.eth.contract(address=feed_address, abi=CHAINLINK_ABI)
         
-        # Get decimals
-        decimals = contract.functions.decimals().call()
+        # Decimals are fixed per feed, no need to query them
+        decimals = CHAINLINK_DECIMALS[token_symbol]
         
         # Get latest round data
         round_data = contract.functions.latestRoundData().call()
         answer = round_data[1]  # The price is in the second element
         
-        # Convert to float (adjust for decimals)
-        price_float = float(answer) / (10 ** decimals)
-        
-        if price_float <= 0:
-            logger.warning(f"Received invalid price ({price_float}) for {token_symbol}")
-            return None
-        
-        # Calculate deviation from $1.00 peg
-        deviation_from_peg = price_float - 1.0
-        
-        # Get current UTC timestamp
-        timestamp = int(datetime.now(timezone.utc).timestamp())
-        
-        logger.info(
-            f"  {token_symbol} price: ${price_float:.6f} "
-            f"(deviation: {deviation_from_peg:.6f}, {deviation_from_peg*100:.4f}%)"
-        )
-        
-        return {
-            "timestamp": timestamp,
-            "token_symbol": token_symbol,
-            "price": price_float,
-            "deviation_from_peg": deviation_from_peg
-        }
+        return _build_price_record(token_symbol, answer, decimals)
         
     except Exception as e:
         logger.error(f"Error fetching {token_symbol} price from Chainlink feed: {str(e)}")
@@ -165,39 +310,73 @@ def fetch_token_price(w3: Web3, token_symbol: str, feed_address: str) -> Optiona
         return None
 
 
-def fetch_all_chainlink_prices() -> pd.DataFrame:
+def fetch_prices_multicall(rpc_url: str, token_symbols: list) -> list:
     """
-    Fetch Chainlink price data for all configured tokens.
+    Fetch prices for several tokens with one Multicall3 aggregate3() eth_call.
     
-    This function is designed to be reusable for Dagster jobs and dbt pipelines.
+    All latestRoundData() calls are executed by the Multicall3 contract in a
+    single RPC round-trip, so every price is read at the same block height
+    regardless of token count. Calls are sent with allowFailure so one broken
+    feed does not revert the others.
     
+    Args:
+        rpc_url: Ethereum mainnet RPC endpoint URL
+        token_symbols: Token symbols with a configured Chainlink feed
+        
     Returns:
-        DataFrame with columns: timestamp, token_symbol, price, deviation_from_peg
+        List of price data dictionaries for the tokens fetched successfully
         
     Raises:
-        RuntimeError: If no price data could be fetched for any token
+        ConnectionError: If the multicall request fails
     """
-    logger.info("Starting Chainlink price fetch for all tokens...")
+    round_data_call = bytes.fromhex(LATEST_ROUND_DATA_SELECTOR[2:])
+    calls = [(_FEEDS[token_symbol], True, round_data_call) for token_symbol in token_symbols]
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "eth_call",
+        "params": [
+            {
+                "to": MULTICALL3_ADDRESS,
+                "data": AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [calls]).hex()
+            },
+            "latest"
+        ]
+    }
     
-    # Get Web3 connection
+    logger.info(f"Sending Multicall3 aggregate3 with {len(calls)} call(s)...")
     try:
-        w3 = get_web3_connection()
-    except (ValueError, ConnectionError) as e:
-        logger.error(f"Failed to establish Web3 connection: {str(e)}")
-        raise
+        response = _SESSION.post(rpc_url, json=payload, timeout=RPC_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        body = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"Multicall request failed: {str(e)}")
+        raise ConnectionError(f"Multicall request failed: {str(e)}")
     
-    all_data = []
+    if "result" not in body:
+        raise ConnectionError(f"Multicall request failed: {body.get('error', body)}")
     
-    # Fetch prices for each token
-    for token_symbol in TOKEN_SYMBOLS:
-        if token_symbol not in CHAINLINK_FEEDS:
-            logger.warning(f"No feed address configured for {token_symbol}, skipping...")
-            continue
-        
-        feed_address = CHAINLINK_FEEDS[token_symbol]
-        
+    # An endpoint without Multicall3 returns "0x"; treat undecodable results as
+    # a failed request so callers fall back to per-token calls
+    try:
+        (results,) = decode(["(bool,bytes)[]"], bytes.fromhex(body["result"][2:]))
+    except (TypeError, ValueError, DecodingError) as e:
+        logger.error(f"Multicall result could not be decoded: {str(e)}")
+        raise ConnectionError(f"Multicall result could not be decoded: {str(e)}")
+    
+    # Every price comes from the same block, so they share one timestamp
+    fetch_timestamp = int(time.time())
+    
+    all_data = []
+    for token_symbol, (success, return_data) in zip(token_symbols, results):
         try:
-            price_data = fetch_token_price(w3, token_symbol, feed_address)
+            if not success:
+                raise RuntimeError("latestRoundData() reverted")
+            
+            # latestRoundData returns (roundId, answer, ...); the price is the second word
+            answer = _decode_word(return_data.hex(), index=1, signed=True)
+            
+            price_data = _build_price_record(token_symbol, answer, CHAINLINK_DECIMALS[token_symbol], fetch_timestamp)
             
             if price_data is not None:
                 all_data.append(price_data)
@@ -206,30 +385,142 @@ def fetch_all_chainlink_prices() -> pd.DataFrame:
                 logger.warning(f"Failed to fetch price data for {token_symbol}")
                 
         except Exception as e:
-            logger.error(f"Unexpected error processing {token_symbol}: {str(e)}")
-            logger.exception("Full error traceback:")
+            logger.error(f"Error decoding {token_symbol} price from Chainlink feed: {str(e)}")
             continue
     
+    return all_data
+
+
+def fetch_prices_parallel(w3: Web3, token_symbols: list) -> list:
+    """
+    Fetch prices for several tokens concurrently, one web3 call per token.
+    
+    Used as the fallback when the Multicall3 request fails. The Web3 instance
+    is shared across threads; its HTTP provider is safe for concurrent reads.
+    
+    Args:
+        w3: Web3 instance connected to Ethereum
+        token_symbols: Token symbols with a configured Chainlink feed
+        
+    Returns:
+        List of price data dictionaries for the tokens fetched successfully
+    """
+    # One timestamp for the whole batch so the tokens' rows line up
+    fetch_timestamp = int(time.time())
+    all_data = []
+    
+    with ThreadPoolExecutor(max_workers=max(len(token_symbols), 1)) as executor:
+        futures = {
+            executor.submit(fetch_token_price, w3, token_symbol): token_symbol
+            for token_symbol in token_symbols
+        }
+        
+        for future in as_completed(futures):
+            token_symbol = futures[future]
+            try:
+                price_data = future.result()
+                
+                if price_data is not None:
+                    price_data["timestamp"] = fetch_timestamp
+                    all_data.append(price_data)
+                    logger.info(f"Successfully fetched {token_symbol} price data")
+                else:
+                    logger.warning(f"Failed to fetch price data for {token_symbol}")
+                    
+            except Exception as e:
+                logger.error(f"Unexpected error processing {token_symbol}: {str(e)}")
+                logger.exception("Full error traceback:")
+                continue
+    
+    return all_data
+
+
+def fetch_all_chainlink_prices() -> pd.DataFrame:
+    """
+    Fetch Chainlink price data for all configured tokens.
+    
+    This function is designed to be reusable for Dagster jobs and dbt pipelines.
+    
+    Returns:
+        DataFrame with columns: TIMESTAMP, TOKEN, PRICE, DEVIATION_FROM_1
+        
+    Raises:
+        ValueError: If ALCHEMY_RPC_URL is not set
+        ConnectionError: If the RPC endpoint cannot be reached
+        RuntimeError: If no price data could be fetched for any token
+    """
+    logger.info("Starting Chainlink price fetch for all tokens...")
+    
+    # Resolve RPC endpoint
+    try:
+        rpc_url = get_rpc_url()
+    except ValueError as e:
+        logger.error(f"Failed to resolve RPC endpoint: {str(e)}")
+        raise
+    
+    token_symbols = []
+    for token_symbol in TOKEN_SYMBOLS:
+        if token_symbol not in CHAINLINK_FEEDS or token_symbol not in CHAINLINK_DECIMALS:
+            logger.warning(f"No feed address configured for {token_symbol}, skipping...")
+            continue
+        token_symbols.append(token_symbol)
+    
+    # Fetch prices for all tokens in one round-trip, falling back to
+    # concurrent per-token calls if the multicall fails
+    try:
+        all_data = fetch_prices_multicall(rpc_url, token_symbols)
+    except ConnectionError as e:
+        logger.warning(f"Multicall fetch failed ({str(e)}), falling back to per-token calls...")
+        try:
+            w3 = get_web3_connection()
+        except (ValueError, ConnectionError) as e:
+            logger.error(f"Failed to establish Web3 connection: {str(e)}")
+            raise
+        all_data = fetch_prices_parallel(w3, token_symbols)
+    
     # Check if we got any data
     if not all_data:
         error_msg = "Failed to fetch price data for any token"
         logger.error(error_msg)
         raise RuntimeError(error_msg)
     
-    # Create DataFrame
-    df = pd.DataFrame(all_data)
-    
-    # Ensure columns are in the correct order
-    df = df[["timestamp", "token_symbol", "price", "deviation_from_peg"]]
-    
-    # Sort by token_symbol for consistent output
-    df = df.sort_values("token_symbol").reset_index(drop=True)
+    # Create DataFrame in the Snowflake table layout
+    df = build_price_frame(all_data)
     
     logger.info(f"Successfully fetched price data for {len(df)} token(s)")
     
     return df
 
 
+def verify_chainlink_decimals() -> None:
+    """
+    Check that the on-chain decimals() of every feed match CHAINLINK_DECIMALS.
+    
+    Decimals are hardcoded to avoid an RPC round-trip on every fetch, so this
+    one-time check is run from the Snowflake setup script to catch drift.
+    
+    Raises:
+        ValueError: If ALCHEMY_RPC_URL is not set
+        ConnectionError: If connection to RPC endpoint fails
+        RuntimeError: If any feed reports different decimals
+    """
+    w3 = get_web3_connection(verify_connection=True)
+    
+    mismatches = []
+    for token_symbol, feed_address in _FEEDS.items():
+        contract = w3.eth.contract(address=feed_address, abi=CHAINLINK_ABI)
+        onchain_decimals = contract.functions.decimals().call()
+        expected_decimals = CHAINLINK_DECIMALS.get(token_symbol)
+        
+        if onchain_decimals != expected_decimals:
+            mismatches.append(f"{token_symbol} (on-chain {onchain_decimals}, configured {expected_decimals})")
+        else:
+            logger.info(f"{token_symbol} feed decimals verified: {onchain_decimals}")
+    
+    if mismatches:
+        raise RuntimeError(f"Chainlink feed decimals mismatch: {', '.join(mismatches)}")
+
+
 def save_to_csv(df: pd.DataFrame, output_dir: str = "data") -> str:
     """
     Save DataFrame to CSV file.
@@ -267,6 +558,9 @@ def main():
         logger.info("Chainlink Price Fetch Script")
         logger.info("=" * 60)
         
+        # Check the endpoint up front so configuration problems fail fast
+        get_web3_connection(verify_connection=True)
+        
         # Fetch all prices
         df = fetch_all_chainlink_prices()
         
@@ -284,9 +578,9 @@ def main():
         # Print summary statistics
         print("\nSummary Statistics:")
         print(f"  Total tokens: {len(df)}")
-        print(f"  Average price: ${df['price'].mean():.6f}")
-        print(f"  Average deviation: {df['deviation_from_peg'].mean():.6f} ({df['deviation_from_peg'].mean()*100:.4f}%)")
-        print(f"  Max deviation: {df['deviation_from_peg'].abs().max():.6f} ({df['deviation_from_peg'].abs().max()*100:.4f}%)")
+        print(f"  Average price: ${df['PRICE'].mean():.6f}")
+        print(f"  Average deviation: {df['DEVIATION_FROM_1'].mean():.6f} ({df['DEVIATION_FROM_1'].mean()*100:.4f}%)")
+        print(f"  Max deviation: {df['DEVIATION_FROM_1'].abs().max():.6f} ({df['DEVIATION_FROM_1'].abs().max()*100:.4f}%)")
         
         logger.info("Chainlink price fetching completed successfully!")
         
@@ -0,0 +1,85 @@
+"""
+Snowflake DDL for the stablecoin monitor schema.
+
+Shared by the setup script and the Dagster load op, and kept free of other
+imports so either can use it without pulling in the fetch code.
+"""
+
+# Raw price table DDL (also used by the Dagster op to self-heal a missing table)
+CREATE_CHAINLINK_PRICES_TABLE = """
+CREATE TABLE IF NOT EXISTS CHAINLINK_PRICES (
+    TIMESTAMP BIGINT,
+    TOKEN VARCHAR(10),
+    PRICE DOUBLE,
+    DEVIATION_FROM_1 DOUBLE,
+    LOADED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+)
+"""
+
+# Peg health view over the raw prices
+CREATE_PEG_HEALTH_VIEW = """
+CREATE OR REPLACE VIEW stablecoin_peg_health AS
+SELECT
+    TIMESTAMP,
+    TOKEN,
+    PRICE,
+    PRICE - 1.0 AS DEVIATION_FROM_PEG,
+    ABS(PRICE - 1.0) AS ABS_DEVIATION_FROM_PEG,
+    (PRICE - 1.0) * 100 AS DEVIATION_FROM_PEG_PCT,
+    CASE
+        WHEN ABS(PRICE - 1.0) <= 0.001 THEN 'healthy'
+        WHEN ABS(PRICE - 1.0) <= 0.005 THEN 'warning'
+        ELSE 'critical'
+    END AS PEG_STATUS,
+    LOADED_AT
+FROM CHAINLINK_PRICES
+ORDER BY TOKEN, TIMESTAMP DESC
+"""
+
+# 24h rolling statistics and z-scores, kept fresh by Snowflake as a dynamic
+# table instead of being rebuilt from scratch after every load
+CREATE_ZSCORE_DYNAMIC_TABLE = """
+CREATE OR REPLACE DYNAMIC TABLE stablecoin_peg_zscore
+TARGET_LAG = '1 minute'
+WAREHOUSE = {warehouse}
+AS
+WITH peg_data AS (
+    SELECT * FROM stablecoin_peg_health
+),
+rolling_stats AS (
+    SELECT
+        TIMESTAMP,
+        TOKEN,
+        PRICE,
+        DEVIATION_FROM_PEG,
+        AVG(DEVIATION_FROM_PEG) OVER (
+            PARTITION BY TOKEN
+            ORDER BY TIMESTAMP
+            RANGE BETWEEN 86400 PRECEDING AND CURRENT ROW
+        ) AS ROLLING_MEAN_24H,
+        STDDEV(DEVIATION_FROM_PEG) OVER (
+            PARTITION BY TOKEN
+            ORDER BY TIMESTAMP
+            RANGE BETWEEN 86400 PRECEDING AND CURRENT ROW
+        ) AS ROLLING_STDDEV_24H
+    FROM peg_data
+)
+SELECT
+    TIMESTAMP,
+    TOKEN,
+    PRICE,
+    DEVIATION_FROM_PEG,
+    ROLLING_MEAN_24H,
+    ROLLING_STDDEV_24H,
+    CASE
+        WHEN ROLLING_STDDEV_24H > 0
+        THEN (DEVIATION_FROM_PEG - ROLLING_MEAN_24H) / ROLLING_STDDEV_24H
+        ELSE 0
+    END AS ZSCORE,
+    CASE
+        WHEN ABS((DEVIATION_FROM_PEG - ROLLING_MEAN_24H) / NULLIF(ROLLING_STDDEV_24H, 0)) > 2 THEN 'outlier'
+        WHEN ABS((DEVIATION_FROM_PEG - ROLLING_MEAN_24H) / NULLIF(ROLLING_STDDEV_24H, 0)) > 1 THEN 'unusual'
+        ELSE 'normal'
+    END AS ZSCORE_STATUS
+FROM rolling_stats
+"""
@@ -3,12 +3,31 @@ Script to continuously fetch real-time Chainlink price data.
 Run this script to keep your data fresh - it fetches data every minute.
 Press Ctrl+C to stop.
 """
+import math
 import time
 import sys
-from load_real_data import load_real_chainlink_data
+from snowflake.connector.errors import OperationalError
+from load_real_data import load_real_chainlink_data, get_snowflake_connection
+
+# Warn once fetches overrun the cadence this many times in a row
+DRIFT_WARNING_ITERATIONS = 3
 
 def fetch_continuously(interval_seconds=60):
-    """Fetch data continuously at specified interval."""
+    """
+    Fetch data continuously at specified interval.
+    
+    Fetches are scheduled against fixed deadlines (start + n * interval), so
+    the time spent fetching is subtracted from the wait and the cadence does
+    not drift. If a fetch stalls past one or more deadlines, the missed slots
+    are skipped rather than fired back to back. An interval of 0 fetches back
+    to back with no schedule.
+    
+    Raises:
+        ValueError: If interval_seconds is negative
+    """
+    if interval_seconds < 0:
+        raise ValueError(f"interval_seconds must be >= 0, got {interval_seconds}")
+    
     print("=" * 60)
     print("Continuous Data Fetching Started")
     print("=" * 60)
@@ -16,6 +35,12 @@ def fetch_continuously(interval_seconds=60):
     print("Press Ctrl+C to stop\n")
     
     fetch_count = 0
+    slot = 0
+    overruns = 0
+    start = time.monotonic()
+    # Keep one Snowflake session open across iterations instead of
+    # re-authenticating every fetch
+    conn = None
     try:
         while True:
             fetch_count += 1
@@ -24,19 +49,55 @@ def fetch_continuously(interval_seconds=60):
             print(f"{'='*60}")
             
             try:
-                load_real_chainlink_data()
-                print(f"\n⏳ Waiting {interval_seconds} seconds until next fetch...")
-                time.sleep(interval_seconds)
+                if conn is None:
+                    conn = get_snowflake_connection()
+                load_real_chainlink_data(conn)
             except KeyboardInterrupt:
                 raise
+            except OperationalError as e:
+                # Session dropped; reconnect on the next iteration
+                print(f"❌ Snowflake connection error: {str(e)}")
+                conn = _close_quietly(conn)
             except Exception as e:
                 print(f"❌ Error during fetch: {str(e)}")
-                print(f"⏳ Retrying in {interval_seconds} seconds...")
-                time.sleep(interval_seconds)
+            
+            # No schedule to keep when fetching back to back
+            if interval_seconds == 0:
+                continue
+            
+            # Sleep until the next deadline rather than a full interval
+            slot += 1
+            now = time.monotonic()
+            if start + slot * interval_seconds < now:
+                # Behind schedule: jump to the next future deadline so missed
+                # slots aren't fetched back to back
+                next_slot = math.ceil((now - start) / interval_seconds)
+                print(f"⚠️ Skipping {next_slot - slot} missed fetch slot(s)")
+                slot = next_slot
+                overruns += 1
+                if overruns >= DRIFT_WARNING_ITERATIONS:
+                    print(f"⚠️ Fetch is slower than the {interval_seconds}s cadence "
+                          f"({overruns} consecutive overruns)")
+            else:
+                overruns = 0
+            remaining = start + slot * interval_seconds - now
+            print(f"\n⏳ Waiting {max(0, remaining):.1f} seconds until next fetch...")
+            time.sleep(max(0, remaining))
                 
     except KeyboardInterrupt:
         print(f"\n\n✅ Stopped after {fetch_count} fetches")
         print("Data fetching stopped by user")
+    finally:
+        _close_quietly(conn)
+
+def _close_quietly(conn):
+    """Close a Snowflake connection, ignoring errors from a dead session."""
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    return None
 
 if __name__ == "__main__":
     # Default to 60 seconds, but allow override via command line
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import io
 import os
 from dotenv import load_dotenv
 from snowflake.connector import connect
@@ -20,65 +21,17 @@ st.set_page_config(
 )
 
 # Custom CSS for professional styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #1f77b4;
-        margin-bottom: 0.5rem;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #666;
-        margin-bottom: 2rem;
-        line-height: 1.6;
-    }
-    .metric-card {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #1f77b4;
-    }
-    .status-healthy {
-        color: #28a745;
-        font-weight: 600;
-    }
-    .status-warning {
-        color: #ffc107;
-        font-weight: 600;
-    }
-    .status-critical {
-        color: #dc3545;
-        font-weight: 600;
-    }
-    .status-normal {
-        color: #28a745;
-        font-weight: 600;
-    }
-    .status-unusual {
-        color: #ffc107;
-        font-weight: 600;
-    }
-    .status-outlier {
-        color: #dc3545;
-        font-weight: 600;
-    }
-    .sidebar-info {
-        background-color: #e7f3ff;
-        padding: 1rem;
-        border-radius: 6px;
-        margin: 1rem 0;
-        font-size: 0.9rem;
-        line-height: 1.5;
-    }
-</style>
-""", unsafe_allow_html=True)
+CUSTOM_CSS_PATH = os.path.join(os.path.dirname(__file__), "static", "custom.css")
+
+
+@st.cache_resource
+def load_custom_css() -> str:
+    """Read the dashboard stylesheet once per server process."""
+    with open(CUSTOM_CSS_PATH) as f:
+        return f"<style>\n{f.read()}</style>"
 
-# Initialize session state
-if 'snowflake_conn' not in st.session_state:
-    st.session_state.snowflake_conn = None
 
+st.markdown(load_custom_css(), unsafe_allow_html=True)
 
 @st.cache_resource
 def get_snowflake_connection():
@@ -123,7 +76,13 @@ def get_snowflake_connection():
             warehouse=required_vars["SNOWFLAKE_WAREHOUSE"],
             database=required_vars["SNOWFLAKE_DATABASE"],
             schema=required_vars["SNOWFLAKE_SCHEMA"],
-            role=required_vars["SNOWFLAKE_ROLE"]
+            role=required_vars["SNOWFLAKE_ROLE"],
+            # Dashboard results are a few thousand rows at most, so one
+            # prefetch thread and small result chunks avoid fetcher setup cost
+            session_parameters={
+                "CLIENT_PREFETCH_THREADS": 1,
+                "CLIENT_RESULT_CHUNK_SIZE": 48,
+            }
         )
         return conn
     except Exception as e:
@@ -131,79 +90,486 @@ def get_snowflake_connection():
         return None
 
 
-@st.cache_data(ttl=60)  # Cache for 1 minute
-def load_peg_health_data(token: str = None):
-    """Load peg health data from Snowflake."""
-    conn = get_snowflake_connection()
+# Tokens tracked by the dashboard
+TOKENS = ["USDC", "USDT"]
+
+# Columns selected from each dbt model, aliased to the lowercase names the
+# dashboard uses (quoted identifiers keep their case in Snowflake)
+MODEL_COLUMNS = {
+    "stablecoin_peg_health": """
+        TIMESTAMP AS "timestamp",
+        TOKEN AS "token",
+        PRICE AS "price",
+        DEVIATION_FROM_PEG AS "deviation_from_peg",
+        DEVIATION_FROM_PEG_PCT AS "deviation_from_peg_pct",
+        PEG_STATUS AS "peg_status"
+    """,
+    "stablecoin_peg_zscore": """
+        TIMESTAMP AS "timestamp",
+        TOKEN AS "token",
+        PRICE AS "price",
+        DEVIATION_FROM_PEG AS "deviation_from_peg",
+        ROLLING_MEAN_24H AS "rolling_mean_24h",
+        ROLLING_STDDEV_24H AS "rolling_stddev_24h",
+        ZSCORE AS "zscore",
+        ZSCORE_STATUS AS "zscore_status"
+    """
+}
+
+
+# Low-cardinality label columns, stored as pandas categoricals after loading
+CATEGORY_COLUMNS = {"token", "peg_status", "zscore_status"}
+
+
+# Selects one token when bound to a symbol, or every tracked token when bound
+# to None, so every loader shares one parameterized template instead of
+# branching on the token in Python. The connector's default pyformat binding
+# escapes and interpolates the values client-side, so the SQL sent to
+# Snowflake still differs per token.
+TOKEN_FILTER = "WHERE TOKEN IN (" + ", ".join(["%s"] * len(TOKENS)) + ") AND (%s IS NULL OR TOKEN = %s)"
+
+
+def _token_params(token: str = None) -> tuple:
+    """Bind values for TOKEN_FILTER."""
+    return (*TOKENS, token, token)
+
+
+def _tidy_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Add a datetime column to a result frame and store labels as categoricals."""
+    if not df.empty:
+        for column in CATEGORY_COLUMNS.intersection(df.columns):
+            df[column] = df[column].astype('category')
+        # Unix seconds to nanoseconds, reinterpreted as datetime64 in one pass
+        seconds = df['timestamp'].to_numpy(dtype=np.int64)
+        df['datetime'] = pd.Series((seconds * 1_000_000_000).view('datetime64[ns]'), index=df.index)
+    return df
+
+
+def _read_frames(conn, statements: list) -> list:
+    """
+    Run several queries in a single multi-statement request.
+    
+    Args:
+        conn: Snowflake connection, or None if not connected
+        statements: List of (query, params) pairs; queries must not end in ';'
+        
+    Returns:
+        One DataFrame per statement, in order
+    """
     if conn is None:
-        return pd.DataFrame()
+        return [pd.DataFrame() for _ in statements]
+    
+    query = ";\n".join(q for q, _ in statements)
+    params = tuple(p for _, ps in statements for p in ps)
+    
+    frames = []
+    with conn.cursor() as cur:
+        cur.execute(query, params, num_statements=len(statements))
+        frames.append(_tidy_frame(cur.fetch_pandas_all()))
+        while cur.nextset():
+            frames.append(_tidy_frame(cur.fetch_pandas_all()))
+    
+    return frames
+
+
+def _series_query(model: str) -> str:
+    """Build a query for the latest rows of a model, returned oldest first."""
+    return f"""
+    SELECT * FROM (
+        SELECT {MODEL_COLUMNS[model]}
+        FROM {model}
+        {TOKEN_FILTER}
+        ORDER BY TIMESTAMP DESC, TOKEN
+        LIMIT %s
+    )
+    ORDER BY "timestamp"
+    """
+
+
+def _latest_query(model: str) -> str:
+    """Build a query for the most recent row of a model for each token."""
+    return f"""
+    SELECT {MODEL_COLUMNS[model]}
+    FROM {model}
+    {TOKEN_FILTER}
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY TOKEN ORDER BY TIMESTAMP DESC) = 1
+    ORDER BY TOKEN
+    """
+
+
+def _recent_query(model: str) -> str:
+    """Build a query for the most recent rows of a model, newest first."""
+    return f"""
+    SELECT {MODEL_COLUMNS[model]}
+    FROM {model}
+    {TOKEN_FILTER}
+    ORDER BY TIMESTAMP DESC
+    LIMIT %s
+    """
+
+
+def _zscore_wide_query() -> str:
+    """
+    Build a query for z-scores with one column per tracked token, oldest first.
     
+    Conditional aggregation returns the heatmap's wide layout directly, so the
+    all-tokens view needs no pivot in pandas. The limit applies to the same
+    latest rows as _series_query, not to timestamps, so the wide and tidy
+    charts on the page cover the same window.
+    """
+    token_columns = ",\n        ".join(
+        f"MAX(CASE WHEN TOKEN = '{t}' THEN ZSCORE END) AS \"{t}\"" for t in TOKENS
+    )
+    return f"""
+    SELECT
+        TIMESTAMP AS "timestamp",
+        {token_columns}
+    FROM (
+        SELECT TIMESTAMP, TOKEN, ZSCORE
+        FROM stablecoin_peg_zscore
+        {TOKEN_FILTER}
+        ORDER BY TIMESTAMP DESC, TOKEN
+        LIMIT %s
+    )
+    GROUP BY TIMESTAMP
+    ORDER BY "timestamp"
+    """
+
+
+def _page_statements(model: str, token: str, series_limit: int, recent_limit: int) -> list:
+    """Build the series, latest-per-token and recent-rows statements for a page."""
+    params = _token_params(token)
+    return [
+        (_series_query(model), params + (series_limit,)),
+        (_latest_query(model), params),
+        (_recent_query(model), params + (recent_limit,)),
+    ]
+
+
+def _to_feather(df: pd.DataFrame) -> bytes:
+    """Serialize a frame to Arrow IPC (feather) bytes; empty frames become b''."""
+    if df.empty:
+        return b""
+    buf = io.BytesIO()
+    df.to_feather(buf)
+    return buf.getvalue()
+
+
+def _from_feather(blob: bytes) -> pd.DataFrame:
+    """Deserialize bytes produced by _to_feather."""
+    if not blob:
+        return pd.DataFrame()
+    return pd.read_feather(io.BytesIO(blob))
+
+
+# The cached loaders hold Arrow bytes rather than DataFrames, so a cache hit
+# is an Arrow read instead of an unpickle of Python objects. The leading
+# underscore on _conn keeps the connection out of the cache key.
+@st.cache_data(ttl=60, max_entries=8)  # Cache for 1 minute
+def _load_peg_health_blobs(_conn, token: str = None):
+    """Load peg health series, latest and recent rows from Snowflake as feather bytes."""
     try:
-        query = """
-        SELECT 
-            TIMESTAMP,
-            TOKEN,
-            PRICE,
-            DEVIATION_FROM_PEG,
-            DEVIATION_FROM_PEG_PCT,
-            PEG_STATUS
-        FROM stablecoin_peg_health
-        """
-        
-        if token:
-            query += f" WHERE TOKEN = '{token}'"
-        
-        query += " ORDER BY TIMESTAMP DESC LIMIT 1000"
-        
-        df = pd.read_sql(query, conn)
-        
-        if not df.empty:
-            df.columns = df.columns.str.lower()
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-            df = df.sort_values('datetime')
-        
-        return df
+        frames = _read_frames(_conn, _page_statements("stablecoin_peg_health", token, 1000, 50))
+        return tuple(_to_feather(df) for df in frames)
     except Exception as e:
         st.error(f"Error loading peg health data: {str(e)}")
-        return pd.DataFrame()
+        return b"", b"", b""
 
 
-@st.cache_data(ttl=300)
-def load_zscore_data(token: str = None):
-    """Load z-score data from Snowflake."""
-    conn = get_snowflake_connection()
-    if conn is None:
-        return pd.DataFrame()
+@st.cache_data(ttl=300, max_entries=8)
+def _load_zscore_blobs(_conn, token: str = None):
+    """
+    Load z-score series, latest and recent rows from Snowflake as feather bytes.
     
+    When no token is selected a fourth statement fetches the per-token wide
+    z-score frame; otherwise that slot is empty.
+    """
     try:
-        query = """
-        SELECT 
-            TIMESTAMP,
-            TOKEN,
-            PRICE,
-            DEVIATION_FROM_PEG,
-            ROLLING_MEAN_24H,
-            ROLLING_STDDEV_24H,
-            ZSCORE,
-            ZSCORE_STATUS
-        FROM stablecoin_peg_zscore
-        """
-        
-        if token:
-            query += f" WHERE TOKEN = '{token}'"
-        
-        query += " ORDER BY TIMESTAMP DESC LIMIT 5000"
-        
-        df = pd.read_sql(query, conn)
-        
-        if not df.empty:
-            df.columns = df.columns.str.lower()
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-        
-        return df
+        series_limit = 5000
+        statements = _page_statements("stablecoin_peg_zscore", token, series_limit, 100)
+        if token is None:
+            statements.append((_zscore_wide_query(), _token_params(None) + (series_limit,)))
+        frames = _read_frames(_conn, statements)
+        if token is not None:
+            frames.append(pd.DataFrame())
+        return tuple(_to_feather(df) for df in frames)
     except Exception as e:
         st.error(f"Error loading z-score data: {str(e)}")
-        return pd.DataFrame()
+        return b"", b"", b"", b""
+
+
+def load_peg_health_data(conn, token: str = None):
+    """Load peg health series, latest and recent rows as DataFrames."""
+    return tuple(_from_feather(blob) for blob in _load_peg_health_blobs(conn, token))
+
+
+def load_zscore_data(conn, token: str = None):
+    """Load z-score series, latest, recent and all-tokens wide rows as DataFrames."""
+    return tuple(_from_feather(blob) for blob in _load_zscore_blobs(conn, token))
+
+
+# CSS class for each peg / z-score status, the z-score bar colors, and the
+# card a status renders in
+STATUS_CLASS = {
+    'healthy': 'status-healthy',
+    'warning': 'status-warning',
+    'critical': 'status-critical',
+    'normal': 'status-normal',
+    'unusual': 'status-unusual',
+    'outlier': 'status-outlier'
+}
+STATUS_COLOR = {
+    'normal': '#28a745',
+    'unusual': '#ffc107',
+    'outlier': '#dc3545'
+}
+STATUS_CARD_HTML = '<div class="metric-card"><strong>Status:</strong><br><span class="{css_class}">{label}</span></div>'
+
+
+def _status_card(status: str) -> str:
+    """Render a status value as a metric card."""
+    return STATUS_CARD_HTML.format(css_class=STATUS_CLASS.get(status, ''), label=status.title())
+
+
+# Timestamp display format for the recent-updates tables (moment.js syntax)
+TABLE_DATETIME_FORMAT = "YYYY-MM-DD HH:mm:ss"
+
+
+# Maximum points per line trace; longer series are downsampled with LTTB
+MAX_CHART_POINTS = 1500
+
+
+def _lttb_downsample(x, y, n_out: int = MAX_CHART_POINTS):
+    """
+    Downsample a line series with Largest-Triangle-Three-Buckets.
+    
+    Keeps the first and last points and, for each bucket in between, the point
+    forming the largest triangle with the previously kept point and the next
+    bucket's average, so spikes survive. Series of n_out points or fewer are
+    returned unchanged.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= n_out or n_out < 3:
+        return x, y
+    
+    # Missing values can't be ranked by area, drop them before bucketing
+    finite = np.isfinite(y)
+    x, y = x[finite], y[finite]
+    n = len(x)
+    if n <= n_out:
+        return x, y
+    
+    # Triangle areas need numeric x; datetimes become int nanoseconds
+    if np.issubdtype(x.dtype, np.datetime64):
+        xf = x.astype(np.int64).astype(np.float64)
+    else:
+        xf = x.astype(np.float64)
+    
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = xf[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        area = np.abs(
+            (xf[a] - avg_x) * (y[start:end] - y[a])
+            - (xf[a] - xf[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    
+    return x[keep], y[keep]
+
+
+# Figure builders are cached on their input frames, so a rerun with unchanged
+# data and filter reuses the built figure instead of re-adding every trace
+@st.cache_data(max_entries=8)
+def build_price_fig(df_peg: pd.DataFrame, token: str = None) -> go.Figure:
+    """Build the price-over-time chart for one token, or one trace per token."""
+    fig_price = go.Figure()
+    if token:
+        chart_data = df_peg.set_index('datetime')
+        x, y = _lttb_downsample(chart_data.index, chart_data['price'])
+        fig_price.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            mode='lines',
+            name=token,
+            line=dict(color='#1f77b4', width=2)
+        ))
+    else:
+        for name, token_data in df_peg.set_index('datetime').groupby('token', sort=False, observed=True):
+            x, y = _lttb_downsample(token_data.index, token_data['price'])
+            fig_price.add_trace(go.Scattergl(
+                x=x,
+                y=y,
+                mode='lines',
+                name=name,
+                line=dict(width=2)
+            ))
+    fig_price.update_layout(
+        xaxis_title="Time",
+        yaxis_title="Price (USD)",
+        hovermode='x unified',
+        height=400,
+        template='plotly_white'
+    )
+    return fig_price
+
+
+@st.cache_data(max_entries=8)
+def build_deviation_fig(df_peg: pd.DataFrame, token: str = None) -> go.Figure:
+    """Build the deviation-from-peg chart for one token, or one trace per token."""
+    fig_dev = go.Figure()
+    if token:
+        chart_data = df_peg.set_index('datetime')
+        x, y = _lttb_downsample(chart_data.index, chart_data['deviation_from_peg'])
+        fig_dev.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            mode='lines',
+            name=token,
+            line=dict(color='#d62728', width=2),
+            fill='tozeroy'
+        ))
+    else:
+        for name, token_data in df_peg.set_index('datetime').groupby('token', sort=False, observed=True):
+            x, y = _lttb_downsample(token_data.index, token_data['deviation_from_peg'])
+            fig_dev.add_trace(go.Scattergl(
+                x=x,
+                y=y,
+                mode='lines',
+                name=name,
+                line=dict(width=2),
+                fill='tozeroy'
+            ))
+    fig_dev.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Target Peg")
+    fig_dev.update_layout(
+        xaxis_title="Time",
+        yaxis_title="Deviation from $1.00",
+        hovermode='x unified',
+        height=400,
+        template='plotly_white'
+    )
+    return fig_dev
+
+
+@st.cache_data(max_entries=8)
+def build_zscore_fig(df_zscore: pd.DataFrame) -> go.Figure:
+    """Build the z-score-over-time chart for a single token."""
+    zscore_data = df_zscore.set_index('datetime')
+    fig_z = go.Figure()
+    x, y = _lttb_downsample(zscore_data.index, zscore_data['zscore'])
+    fig_z.add_trace(go.Scattergl(
+        x=x,
+        y=y,
+        mode='lines',
+        name='Z-Score',
+        line=dict(color='#1f77b4', width=2)
+    ))
+    fig_z.add_hline(y=1, line_dash="dash", line_color="orange", annotation_text="±1σ Threshold")
+    fig_z.add_hline(y=-1, line_dash="dash", line_color="orange")
+    fig_z.add_hline(y=2, line_dash="dash", line_color="red", annotation_text="±2σ Threshold")
+    fig_z.add_hline(y=-2, line_dash="dash", line_color="red")
+    fig_z.add_hline(y=0, line_dash="dot", line_color="gray")
+    fig_z.update_layout(
+        xaxis_title="Time",
+        yaxis_title="Z-Score",
+        hovermode='x unified',
+        height=400,
+        template='plotly_white'
+    )
+    return fig_z
+
+
+@st.cache_data(max_entries=8)
+def build_zscore_heatmap_fig(pivot_data: pd.DataFrame) -> go.Figure:
+    """Build the token-by-time z-score heatmap from a frame with one column per token."""
+    fig = px.imshow(
+        pivot_data.T,
+        labels=dict(x="Time", y="Token", color="Z-Score"),
+        aspect="auto",
+        color_continuous_scale="RdBu_r",
+        color_continuous_midpoint=0
+    )
+    fig.update_layout(height=400, template='plotly_white')
+    return fig
+
+
+@st.cache_data(max_entries=8)
+def build_zscore_ts_fig(pivot_data: pd.DataFrame) -> go.Figure:
+    """Build the all-tokens z-score chart from a frame with one column per token."""
+    fig_ts = go.Figure()
+    for token in pivot_data.columns:
+        x, y = _lttb_downsample(pivot_data.index, pivot_data[token])
+        fig_ts.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            mode='lines',
+            name=token,
+            line=dict(width=2)
+        ))
+    fig_ts.add_hline(y=1, line_dash="dash", line_color="orange")
+    fig_ts.add_hline(y=-1, line_dash="dash", line_color="orange")
+    fig_ts.add_hline(y=2, line_dash="dash", line_color="red")
+    fig_ts.add_hline(y=-2, line_dash="dash", line_color="red")
+    fig_ts.update_layout(
+        xaxis_title="Time",
+        yaxis_title="Z-Score",
+        hovermode='x unified',
+        height=400,
+        template='plotly_white'
+    )
+    return fig_ts
+
+
+@st.cache_data(max_entries=8)
+def build_zscore_dist_fig(zscores: pd.Series) -> go.Figure:
+    """Build the z-score histogram from bins computed with NumPy."""
+    counts, edges = np.histogram(zscores.dropna().to_numpy(), bins=30)
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    fig_dist = go.Figure(go.Bar(x=centers, y=counts, width=np.diff(edges)))
+    fig_dist.update_layout(
+        xaxis_title="Z-Score",
+        yaxis_title="Frequency",
+        bargap=0,
+        height=300,
+        template='plotly_white'
+    )
+    return fig_dist
+
+
+@st.cache_data(max_entries=8)
+def build_zscore_status_fig(statuses: pd.Series) -> go.Figure:
+    """Build the z-score status count bar chart."""
+    status_counts = statuses.value_counts()
+    fig_status = go.Figure(go.Bar(
+        x=status_counts.index.astype(str),
+        y=status_counts.values,
+        marker_color=[STATUS_COLOR.get(status, '#6c757d') for status in status_counts.index]
+    ))
+    fig_status.update_layout(
+        xaxis_title="Status",
+        yaxis_title="Count",
+        height=300,
+        showlegend=False,
+        template='plotly_white'
+    )
+    return fig_status
+
+
+# Resolve the Snowflake connection once per rerun and reuse it everywhere
+conn = st.session_state.snowflake_conn = st.session_state.get("snowflake_conn") or get_snowflake_connection()
 
 
 # Sidebar
@@ -214,7 +580,7 @@ with st.sidebar:
     # Token selector
     selected_token = st.selectbox(
         "Select Token",
-        options=["All", "USDC", "USDT"],
+        options=["All"] + TOKENS,
         index=0
     )
     
@@ -223,7 +589,6 @@ with st.sidebar:
     st.markdown("---")
     
     # Connection status
-    conn = get_snowflake_connection()
     if conn:
         st.success("Connected to Snowflake")
     else:
@@ -268,129 +633,64 @@ if page == "Peg Deviation":
     Prices are updated in real-time from Chainlink oracle feeds on the Ethereum mainnet.
     """)
     
-    df_peg = load_peg_health_data(token_filter)
+    df_peg, latest_peg, recent_peg = load_peg_health_data(conn, token_filter)
     
     if df_peg.empty:
         st.warning("No peg health data available. Please ensure data has been loaded into Snowflake.")
     else:
-        # Filter out DAI if present
-        df_peg = df_peg[df_peg['token'] != 'DAI']
+        # Current status metrics
+        st.subheader("Current Status")
         
         if token_filter:
-            chart_data = df_peg[df_peg['token'] == token_filter].set_index('datetime')[['price', 'deviation_from_peg']]
-        else:
-            price_data = df_peg.pivot(index='datetime', columns='token', values='price')
-            deviation_data = df_peg.pivot(index='datetime', columns='token', values='deviation_from_peg')
-            chart_data = pd.DataFrame({
-                'price': price_data.mean(axis=1) if len(price_data.columns) > 1 else price_data.iloc[:, 0],
-                'deviation_from_peg': deviation_data.mean(axis=1) if len(deviation_data.columns) > 1 else deviation_data.iloc[:, 0]
-            })
-        
-        if not chart_data.empty:
-            # Current status metrics
-            st.subheader("Current Status")
+            latest = latest_peg.iloc[0]
             col1, col2, col3, col4 = st.columns(4)
-            
-            latest_data = df_peg.groupby('token').last() if not token_filter else df_peg.iloc[-1:].set_index('token')
-            
-            if token_filter:
-                latest = latest_data.loc[token_filter] if token_filter in latest_data.index else latest_data.iloc[0]
-                with col1:
-                    st.metric("Current Price", f"${latest['price']:.6f}")
-                with col2:
-                    st.metric("Deviation", f"{latest['deviation_from_peg']:.6f}")
-                with col3:
-                    st.metric("Deviation %", f"{latest['deviation_from_peg_pct']:.4f}%")
-                with col4:
-                    status = latest.get('peg_status', 'unknown')
-                    status_class = {
-                        'healthy': 'status-healthy',
-                        'warning': 'status-warning',
-                        'critical': 'status-critical'
-                    }.get(status, '')
-                    st.markdown(f'<div class="metric-card"><strong>Status:</strong><br><span class="{status_class}">{status.title()}</span></div>', unsafe_allow_html=True)
-            else:
-                for idx, (token, row) in enumerate(latest_data.iterrows()):
-                    if idx < 4:
-                        with [col1, col2, col3, col4][idx]:
-                            st.metric(f"{token} Price", f"${row['price']:.6f}")
-                            st.caption(f"Deviation: {row['deviation_from_peg_pct']:.4f}%")
-            
-            st.markdown("---")
-            
-            # Price chart
-            st.subheader("Price Over Time")
-            st.markdown("Historical price data from Chainlink oracle feeds")
-            fig_price = go.Figure()
-            if token_filter:
-                fig_price.add_trace(go.Scatter(
-                    x=chart_data.index,
-                    y=chart_data['price'],
-                    mode='lines',
-                    name=token_filter,
-                    line=dict(color='#1f77b4', width=2)
-                ))
-            else:
-                for token in df_peg['token'].unique():
-                    token_data = df_peg[df_peg['token'] == token].set_index('datetime')
-                    fig_price.add_trace(go.Scatter(
-                        x=token_data.index,
-                        y=token_data['price'],
-                        mode='lines',
-                        name=token,
-                        line=dict(width=2)
-                    ))
-            fig_price.update_layout(
-                xaxis_title="Time",
-                yaxis_title="Price (USD)",
-                hovermode='x unified',
-                height=400,
-                template='plotly_white'
-            )
-            st.plotly_chart(fig_price, use_container_width=True)
-            
-            # Deviation chart
-            st.subheader("Deviation from $1.00 Peg")
-            st.markdown("Price deviation from the target peg value")
-            fig_dev = go.Figure()
-            if token_filter:
-                fig_dev.add_trace(go.Scatter(
-                    x=chart_data.index,
-                    y=chart_data['deviation_from_peg'],
-                    mode='lines',
-                    name=token_filter,
-                    line=dict(color='#d62728', width=2),
-                    fill='tozeroy'
-                ))
-            else:
-                for token in df_peg['token'].unique():
-                    token_data = df_peg[df_peg['token'] == token].set_index('datetime')
-                    fig_dev.add_trace(go.Scatter(
-                        x=token_data.index,
-                        y=token_data['deviation_from_peg'],
-                        mode='lines',
-                        name=token,
-                        line=dict(width=2),
-                        fill='tozeroy'
-                    ))
-            fig_dev.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Target Peg")
-            fig_dev.update_layout(
-                xaxis_title="Time",
-                yaxis_title="Deviation from $1.00",
-                hovermode='x unified',
-                height=400,
-                template='plotly_white'
-            )
-            st.plotly_chart(fig_dev, use_container_width=True)
-            
-            # Recent prices table
-            st.subheader("Recent Price Updates")
-            display_df = df_peg[['datetime', 'token', 'price', 'deviation_from_peg_pct', 'peg_status']].head(50)
-            display_df.columns = ['Timestamp', 'Token', 'Price', 'Deviation %', 'Status']
-            display_df['Timestamp'] = display_df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
+            with col1:
+                st.metric("Current Price", f"${latest['price']:.6f}")
+            with col2:
+                st.metric("Deviation", f"{latest['deviation_from_peg']:.6f}")
+            with col3:
+                st.metric("Deviation %", f"{latest['deviation_from_peg_pct']:.4f}%")
+            with col4:
+                st.markdown(_status_card(latest.get('peg_status', 'unknown')), unsafe_allow_html=True)
         else:
-            st.info("No data available for the selected token.")
+            st.dataframe(
+                latest_peg[['token', 'price', 'deviation_from_peg_pct', 'peg_status']],
+                column_config={
+                    'token': st.column_config.TextColumn("Token"),
+                    'price': st.column_config.NumberColumn("Price", format="$%.6f"),
+                    'deviation_from_peg_pct': st.column_config.NumberColumn("Deviation %", format="%.4f%%"),
+                    'peg_status': st.column_config.TextColumn("Status")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        st.markdown("---")
+        
+        # Price chart
+        st.subheader("Price Over Time")
+        st.markdown("Historical price data from Chainlink oracle feeds")
+        st.plotly_chart(build_price_fig(df_peg, token_filter), use_container_width=True, key="fig_price")
+        
+        # Deviation chart
+        st.subheader("Deviation from $1.00 Peg")
+        st.markdown("Price deviation from the target peg value")
+        st.plotly_chart(build_deviation_fig(df_peg, token_filter), use_container_width=True, key="fig_dev")
+        
+        # Recent prices table
+        st.subheader("Recent Price Updates")
+        st.dataframe(
+            recent_peg[['datetime', 'token', 'price', 'deviation_from_peg_pct', 'peg_status']],
+            column_config={
+                'datetime': st.column_config.DatetimeColumn("Timestamp", format=TABLE_DATETIME_FORMAT),
+                'token': st.column_config.TextColumn("Token"),
+                'price': st.column_config.NumberColumn("Price"),
+                'deviation_from_peg_pct': st.column_config.NumberColumn("Deviation %"),
+                'peg_status': st.column_config.TextColumn("Status")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
 
 # Page 2: Peg Z-Score
 elif page == "Peg Z-Score":
@@ -402,19 +702,16 @@ elif page == "Peg Z-Score":
     Z-scores help identify unusual price movements and potential market anomalies.
     """)
     
-    df_zscore = load_zscore_data(token_filter)
+    df_zscore, latest_zscore, recent_zscore, zscore_wide = load_zscore_data(conn, token_filter)
     
     if df_zscore.empty:
         st.warning("No z-score data available. Please ensure data has been loaded into Snowflake.")
     else:
-        # Filter out DAI if present
-        df_zscore = df_zscore[df_zscore['token'] != 'DAI']
-        
         if token_filter:
             st.subheader(f"Z-Score Analysis: {token_filter}")
             
             # Current z-score metrics
-            latest = df_zscore[df_zscore['token'] == token_filter].iloc[-1]
+            latest = latest_zscore.iloc[0]
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
@@ -424,89 +721,30 @@ elif page == "Peg Z-Score":
             with col3:
                 st.metric("Rolling StdDev (24h)", f"{latest['rolling_stddev_24h']:.6f}")
             with col4:
-                status = latest.get('zscore_status', 'unknown')
-                status_class = {
-                    'normal': 'status-normal',
-                    'unusual': 'status-unusual',
-                    'outlier': 'status-outlier'
-                }.get(status, '')
-                st.markdown(f'<div class="metric-card"><strong>Status:</strong><br><span class="{status_class}">{status.title()}</span></div>', unsafe_allow_html=True)
+                st.markdown(_status_card(latest.get('zscore_status', 'unknown')), unsafe_allow_html=True)
             
             st.markdown("---")
             
             # Z-Score time series
             st.subheader("Z-Score Over Time")
-            zscore_data = df_zscore[df_zscore['token'] == token_filter].set_index('datetime')
-            fig_z = go.Figure()
-            fig_z.add_trace(go.Scatter(
-                x=zscore_data.index,
-                y=zscore_data['zscore'],
-                mode='lines',
-                name='Z-Score',
-                line=dict(color='#1f77b4', width=2)
-            ))
-            fig_z.add_hline(y=1, line_dash="dash", line_color="orange", annotation_text="±1σ Threshold")
-            fig_z.add_hline(y=-1, line_dash="dash", line_color="orange")
-            fig_z.add_hline(y=2, line_dash="dash", line_color="red", annotation_text="±2σ Threshold")
-            fig_z.add_hline(y=-2, line_dash="dash", line_color="red")
-            fig_z.add_hline(y=0, line_dash="dot", line_color="gray")
-            fig_z.update_layout(
-                xaxis_title="Time",
-                yaxis_title="Z-Score",
-                hovermode='x unified',
-                height=400,
-                template='plotly_white'
-            )
-            st.plotly_chart(fig_z, use_container_width=True)
+            st.plotly_chart(build_zscore_fig(df_zscore), use_container_width=True, key="fig_zscore")
             
         else:
             st.subheader("Z-Score Heatmap: All Tokens")
             
-            # Create pivot table for heatmap
-            pivot_data = df_zscore.pivot_table(
-                index='datetime',
-                columns='token',
-                values='zscore',
-                aggfunc='mean'
-            )
+            # One z-score column per token, already laid out by Snowflake
+            pivot_data = pd.DataFrame()
+            if not zscore_wide.empty:
+                pivot_data = zscore_wide.set_index('datetime')[TOKENS]
             
             if not pivot_data.empty:
-                fig = px.imshow(
-                    pivot_data.T,
-                    labels=dict(x="Time", y="Token", color="Z-Score"),
-                    aspect="auto",
-                    color_continuous_scale="RdBu_r",
-                    color_continuous_midpoint=0
-                )
-                fig.update_layout(height=400, template='plotly_white')
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(build_zscore_heatmap_fig(pivot_data), use_container_width=True, key="fig_zscore_heatmap")
             
             st.markdown("---")
             
             # Z-score time series for all tokens
             st.subheader("Z-Score Time Series")
-            zscore_chart = df_zscore.pivot(index='datetime', columns='token', values='zscore')
-            fig_ts = go.Figure()
-            for token in zscore_chart.columns:
-                fig_ts.add_trace(go.Scatter(
-                    x=zscore_chart.index,
-                    y=zscore_chart[token],
-                    mode='lines',
-                    name=token,
-                    line=dict(width=2)
-                ))
-            fig_ts.add_hline(y=1, line_dash="dash", line_color="orange")
-            fig_ts.add_hline(y=-1, line_dash="dash", line_color="orange")
-            fig_ts.add_hline(y=2, line_dash="dash", line_color="red")
-            fig_ts.add_hline(y=-2, line_dash="dash", line_color="red")
-            fig_ts.update_layout(
-                xaxis_title="Time",
-                yaxis_title="Z-Score",
-                hovermode='x unified',
-                height=400,
-                template='plotly_white'
-            )
-            st.plotly_chart(fig_ts, use_container_width=True)
+            st.plotly_chart(build_zscore_ts_fig(pivot_data), use_container_width=True, key="fig_zscore_ts")
         
         st.markdown("---")
         
@@ -516,46 +754,26 @@ elif page == "Peg Z-Score":
         
         with col1:
             st.markdown("**Z-Score Distribution**")
-            if token_filter:
-                dist_data = df_zscore[df_zscore['token'] == token_filter]['zscore']
-            else:
-                dist_data = df_zscore['zscore']
-            fig_dist = px.histogram(
-                x=dist_data,
-                nbins=30,
-                labels={'x': 'Z-Score', 'y': 'Frequency'},
-                template='plotly_white'
-            )
-            fig_dist.update_layout(height=300)
-            st.plotly_chart(fig_dist, use_container_width=True)
+            st.plotly_chart(build_zscore_dist_fig(df_zscore['zscore']), use_container_width=True, key="fig_zscore_dist")
         
         with col2:
             st.markdown("**Status Distribution**")
-            if token_filter:
-                status_counts = df_zscore[df_zscore['token'] == token_filter]['zscore_status'].value_counts()
-            else:
-                status_counts = df_zscore['zscore_status'].value_counts()
-            fig_status = px.bar(
-                x=status_counts.index,
-                y=status_counts.values,
-                labels={'x': 'Status', 'y': 'Count'},
-                template='plotly_white',
-                color=status_counts.index,
-                color_discrete_map={
-                    'normal': '#28a745',
-                    'unusual': '#ffc107',
-                    'outlier': '#dc3545'
-                }
-            )
-            fig_status.update_layout(height=300, showlegend=False)
-            st.plotly_chart(fig_status, use_container_width=True)
+            st.plotly_chart(build_zscore_status_fig(df_zscore['zscore_status']), use_container_width=True, key="fig_zscore_status")
         
         # Recent z-scores table
         st.subheader("Recent Z-Score Data")
-        display_df = df_zscore[['datetime', 'token', 'zscore', 'zscore_status', 'deviation_from_peg']].head(100)
-        display_df.columns = ['Timestamp', 'Token', 'Z-Score', 'Status', 'Deviation']
-        display_df['Timestamp'] = display_df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        st.dataframe(
+            recent_zscore[['datetime', 'token', 'zscore', 'zscore_status', 'deviation_from_peg']],
+            column_config={
+                'datetime': st.column_config.DatetimeColumn("Timestamp", format=TABLE_DATETIME_FORMAT),
+                'token': st.column_config.TextColumn("Token"),
+                'zscore': st.column_config.NumberColumn("Z-Score"),
+                'zscore_status': st.column_config.TextColumn("Status"),
+                'deviation_from_peg': st.column_config.NumberColumn("Deviation")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
 
 # Footer
 st.markdown("---")